@@ -3,11 +3,19 @@ Example test file showing how to use the Python SDK
 """
 
 import asyncio
-import json
 import os
+import signal
+import sys
 import uuid
+import orjson
 from dotenv import load_dotenv
 
+try:
+    import uvloop
+except ImportError:
+    # uvloop is optional (not available on Windows), fall back to asyncio's loop
+    uvloop = None
+
 from pysdk import (
     NewFromEnv,
     Plugin,
@@ -28,39 +36,48 @@ from pysdk import (
 # This allows handlers to use plugin methods like done(), progress(), etc.
 plugin: Plugin = None
 
+SETTINGS_FILE = "my_database.json"
+
+# Parsed contents of SETTINGS_FILE, loaded on first use and kept in sync on updates
+_settings_cache = None
+
 
 async def settings_update_handler(msg):
     """Handle settings update"""
+    global _settings_cache
     print("New Update As Settings : ", msg.data.decode())
-    settings = json.loads(msg.data.decode())
+    settings = orjson.loads(msg.data)
     
     try:
-        with open("my_database.json", "w") as f:
-            json.dump(settings, f)
-        await msg.respond(json.dumps({"status": "accepted"}).encode())
+        # Write to a temporary file first so a failed write never corrupts the saved settings
+        tmp_path = SETTINGS_FILE + ".tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(orjson.dumps(settings))
+        os.replace(tmp_path, SETTINGS_FILE)
+        _settings_cache = settings
+        await msg.respond(orjson.dumps({"status": "accepted"}))
     except Exception as e:
         print(f"Error Writing Settings to File: {e}")
-        await msg.respond(json.dumps({"status": "not_accepted", "error": str(e)}).encode())
+        await msg.respond(orjson.dumps({"status": "not_accepted", "error": str(e)}))
 
 
 def get_default_settings():
     """Get default settings from my_database.json"""
-    try:
-        with open("my_database.json", "r") as f:
-            return json.load(f)
-    except Exception:
-        return None
+    global _settings_cache
+    if _settings_cache is None:
+        try:
+            with open(SETTINGS_FILE, "rb") as f:
+                _settings_cache = orjson.loads(f.read())
+        except Exception:
+            return None
+    return _settings_cache
 
 
 def make_enums_project():
     """Make enum list for project"""
-    try:
-        with open("my_database.json", "r") as f:
-            saved_settings = json.load(f)
-            if "project" in saved_settings:
-                return [saved_settings["project"]]
-    except Exception:
-        pass
+    saved_settings = get_default_settings()
+    if saved_settings and "project" in saved_settings:
+        return [saved_settings["project"]]
     return []
 
 
@@ -71,11 +88,11 @@ async def prepare_handler(msg):
     try:
         job_id = str(uuid.uuid4())
         print(f"Job ID: {job_id}")
-        await msg.respond(json.dumps({"jobId": job_id}).encode())
+        await msg.respond(orjson.dumps({"jobId": job_id}))
         await plugin.done(job_id, {"details": "Job completed successfully from prepare handler in py sdk"})
     except Exception as e:
         print(f"Error in prepare_handler: {e}")
-        await msg.respond(json.dumps({"details": {"error": "service unavailable"}}).encode())
+        await msg.respond(orjson.dumps({"details": {"error": "service unavailable"}}))
 
 
 async def scan_gen_graph_handler(msg):
@@ -84,11 +101,11 @@ async def scan_gen_graph_handler(msg):
     try:
         job_id = str(uuid.uuid4())
         print(f"Job ID: {job_id}")
-        await msg.respond(json.dumps({"jobId": job_id}).encode())
+        await msg.respond(orjson.dumps({"jobId": job_id}))
         await plugin.done(job_id, {"details": "Job completed successfully from scan.gen.graph handler in py sdk"})
     except Exception as e:
         print(f"Error in scan_gen_graph_handler: {e}")
-        await msg.respond(json.dumps({"details": {"error": "service unavailable"}}).encode())
+        await msg.respond(orjson.dumps({"details": {"error": "service unavailable"}}))
 
 
 async def main():
@@ -116,6 +133,18 @@ async def main():
     
     print("NATS connection verified successfully")
     
+    event = EventLogger(sdk_instance)
+    
+    # Stop cleanly on SIGINT/SIGTERM so queued events are sent before exiting
+    stop_event = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop_event.set)
+        except NotImplementedError:
+            # Signal handlers are not supported on Windows event loops
+            pass
+    
     try:
         # Set global plugin instance so handlers can access it
         global plugin
@@ -205,19 +234,28 @@ async def main():
             ),
         ])
         
-        event = EventLogger(sdk_instance)
         await event.log("remote-mate-pc", LogLevel.INFO, "start plugin", None)
         
         await plugin.start()
         
-        # Keep running
-        await asyncio.Event().wait()
+        # Keep running until a shutdown signal arrives
+        await stop_event.wait()
         
     finally:
+        await event.close()
+        if plugin is not None:
+            await plugin.stop()
         await sdk_instance.close()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if uvloop is None:
+        asyncio.run(main())
+    elif sys.version_info >= (3, 12):
+        # uvloop.install() is deprecated on 3.12+, pass the loop factory instead
+        asyncio.run(main(), loop_factory=uvloop.new_event_loop)
+    else:
+        uvloop.install()
+        asyncio.run(main())
 
 
@@ -2,19 +2,55 @@
 Event logging for Soren SDK
 """
 
-import json
-import time
+import asyncio
+from time import time as _time
 from typing import Dict, Any, Optional, List
 
+import orjson
+
 from .sorenv import SorenSDK
 from .models import PluginEvent, EventType, LogLevel
 
+# Severity order used to filter log events below the configured minimum level
+_LEVEL_ORDER = {
+    LogLevel.DEBUG: 0,
+    LogLevel.INFO: 1,
+    LogLevel.WARN: 2,
+    LogLevel.ERROR: 3,
+}
+
 
 class EventLogger:
-    """EventLogger handles logging and event emission"""
+    """EventLogger handles logging and event emission
     
-    def __init__(self, sdk: SorenSDK):
+    Events passed to log() and emit_event() are serialized immediately, so a
+    payload that can't be encoded raises in the caller, then queued and sent
+    in batches by a background task: a batch is flushed once it holds
+    max_batch events or flush_interval seconds after its first event,
+    whichever comes first.
+    Log events below min_level are dropped before any work is done.
+    """
+    
+    def __init__(
+        self,
+        sdk: SorenSDK,
+        max_batch: int = 64,
+        flush_interval: float = 0.005,
+        min_level: LogLevel = LogLevel.DEBUG,
+    ):
         self.sdk = sdk
+        config = sdk.config
+        self._plugin_id = config.plugin_id
+        self._source_prefix = f"{config.plugin_id} - "
+        self._log_subject = (
+            f"{config.event_channel}.{config.plugin_id}.log" if config.event_channel else None
+        )
+        self._headers = {"Authorization": config.auth_key} if config.auth_key else None
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self._min_level = _LEVEL_ORDER[min_level]
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
     
     async def log(
         self,
@@ -23,111 +59,156 @@ class EventLogger:
         message: str,
         details: Optional[Dict[str, Any]] = None
     ) -> None:
-        """Send a log event to the Soren platform"""
-        event = PluginEvent(
-            event=EventType.LOG,
-            level=level,
-            source=f"{self.sdk.config.plugin_id} - {source}",
-            message=message,
-            timestamp=int(time.time()),
-            details=details,
-        )
-        await self.send_event(event)
+        """Queue a log event for sending to the Soren platform"""
+        event = self._log_event(source, level, message, details)
+        if event is not None:
+            self._enqueue(event)
     
     async def emit_event(
         self,
         event_type: EventType,
         data: Optional[Dict[str, Any]] = None
     ) -> None:
-        """Send a custom event to the Soren platform"""
+        """Queue a custom event for sending to the Soren platform"""
+        if self._log_subject is None:
+            # Event channel not configured, skip logging
+            return
+        
         event = PluginEvent(
             event=event_type,
             level=LogLevel.INFO,
-            source=self.sdk.config.plugin_id,
-            message=f"Event: {event_type.value}",
-            timestamp=int(time.time()),
+            source=self._plugin_id,
+            # EventType is a str enum, so it concatenates as its value
+            message="Event: " + event_type,
+            timestamp=int(_time()),
             details=data,
         )
-        await self.send_event(event)
+        self._enqueue(event)
     
-    async def send_event(self, event: PluginEvent) -> None:
-        """Send an event to the Soren platform"""
-        if not self.sdk.config.event_channel:
-            # Event channel not configured, skip logging
-            return
-        
-        event_dict = {
-            "event": event.event.value,
-            "level": event.level.value,
-            "source": event.source,
-            "message": event.message,
-            "timestamp": event.timestamp,
-        }
-        if event.details:
-            event_dict["details"] = event.details
-        
-        body = json.dumps([event_dict]).encode()
-        subject = f"{self.sdk.config.event_channel}.{self.sdk.config.plugin_id}.log"
+    async def flush(self) -> None:
+        """Wait until all queued events have been published and flushed"""
+        if self._queue is not None:
+            await self._queue.join()
+        conn = self.sdk.conn
+        if conn is not None and not conn.is_closed:
+            try:
+                await conn.flush()
+            except Exception as e:
+                print(f"Warning: failed to flush events: {e}")
+    
+    async def close(self) -> None:
+        """Send any queued events and stop the background flusher"""
+        await self.flush()
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            except Exception as e:
+                # Shutdown must not fail because of an earlier flusher error
+                print(f"Warning: event flusher stopped with error: {e}")
+            self._task = None
+    
+    def _log_event(
+        self,
+        source: str,
+        level: LogLevel,
+        message: str,
+        details: Optional[Dict[str, Any]],
+    ) -> Optional[PluginEvent]:
+        """Build a log event, or return None if it is filtered out"""
+        if self._log_subject is None or _LEVEL_ORDER[level] < self._min_level:
+            return None
         
-        headers = {}
-        if self.sdk.config.auth_key:
-            headers["Authorization"] = self.sdk.config.auth_key
+        return PluginEvent(
+            event=EventType.LOG,
+            level=level,
+            source=self._source_prefix + source,
+            message=message,
+            timestamp=int(_time()),
+            details=details,
+        )
+    
+    def _enqueue(self, event: PluginEvent) -> None:
+        """Serialize an event and queue it for the background flusher, starting it if needed"""
+        # orjson serializes the dataclass and its str enums directly; non-str
+        # keys in details are stringified as the stdlib json module did
+        event_bytes = orjson.dumps(event, option=orjson.OPT_NON_STR_KEYS)
+        if self._task is None or self._task.done():
+            if self._queue is None:
+                self._queue = asyncio.Queue()
+            self._task = asyncio.ensure_future(self._flusher())
+        self._queue.put_nowait(event_bytes)
+    
+    async def _flusher(self) -> None:
+        """Coalesce queued serialized events into batches and send them"""
+        loop = asyncio.get_event_loop()
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.max_batch:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                # _publish reports and swallows send errors, so the flusher keeps running
+                await self._publish(b"[" + b",".join(batch) + b"]")
+            finally:
+                for _ in batch:
+                    queue.task_done()
+    
+    async def log_sync(
+        self,
+        source: str,
+        level: LogLevel,
+        message: str,
+        details: Optional[Dict[str, Any]] = None
+    ) -> None:
+        """Send a log event and wait for the Soren platform to acknowledge it"""
+        event = self._log_event(source, level, message, details)
+        if event is None:
+            return
+        body = orjson.dumps([event], option=orjson.OPT_NON_STR_KEYS)
         
         try:
-            resp = await self.sdk.conn.request(subject, body, timeout=3, headers=headers if headers else None)
+            resp = await self.sdk.conn.request(self._log_subject, body, timeout=3, headers=self._headers)
             
             if resp and resp.data:
                 try:
-                    response = json.loads(resp.data.decode())
+                    response = orjson.loads(resp.data)
                     if response.get("result") != "OK":
                         # Log warning but don't raise error
                         print(f"Warning: event sending response: {response.get('result')}")
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     # Response is not JSON, that's okay
                     pass
         except Exception as e:
             # Log error but don't raise - event logging should not break the plugin
             print(f"Warning: failed to send event: {e}")
     
+    async def send_event(self, event: PluginEvent) -> None:
+        """Publish an event to the Soren platform without waiting for a reply"""
+        await self.send_multiple_events([event])
+    
     async def send_multiple_events(self, events: List[PluginEvent]) -> None:
-        """Send multiple events in a single request"""
-        if not self.sdk.config.event_channel:
+        """Publish multiple events in a single message without waiting for a reply"""
+        if self._log_subject is None:
             # Event channel not configured, skip logging
             return
         
-        events_list = []
-        for event in events:
-            event_dict = {
-                "event": event.event.value,
-                "level": event.level.value,
-                "source": event.source,
-                "message": event.message,
-                "timestamp": event.timestamp,
-            }
-            if event.details:
-                event_dict["details"] = event.details
-            events_list.append(event_dict)
-        
-        body = json.dumps(events_list).encode()
-        subject = f"{self.sdk.config.event_channel}.{self.sdk.config.plugin_id}.log"
-        
-        headers = {}
-        if self.sdk.config.auth_key:
-            headers["Authorization"] = self.sdk.config.auth_key
-        
+        # orjson serializes the dataclasses and their str enums directly
+        await self._publish(orjson.dumps(events, option=orjson.OPT_NON_STR_KEYS))
+    
+    async def _publish(self, body: bytes) -> None:
+        """Publish a serialized event list to the log subject"""
         try:
-            resp = await self.sdk.conn.request(subject, body, timeout=3, headers=headers if headers else None)
-            
-            if resp and resp.data:
-                try:
-                    response = json.loads(resp.data.decode())
-                    if response.get("result") != "OK":
-                        # Log warning but don't raise error
-                        print(f"Warning: events sending response: {response.get('result')}")
-                except json.JSONDecodeError:
-                    # Response is not JSON, that's okay
-                    pass
+            await self.sdk.conn.publish(self._log_subject, body, headers=self._headers)
         except Exception as e:
             # Log error but don't raise - event logging should not break the plugin
             print(f"Warning: failed to send events: {e}")
-
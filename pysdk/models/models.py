@@ -2,6 +2,7 @@
 Data models for Soren Python SDK
 """
 
+import sys
 from typing import Any, Callable, Dict, Optional, Union, Awaitable
 from dataclasses import dataclass, field
 
@@ -13,15 +14,18 @@ except ImportError:
 
 from .types import EventType, LogLevel
 
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS = {"slots": True} if sys.version_info >= (3, 10) else {}
 
-@dataclass
+
+@dataclass(**_SLOTS)
 class Icon:
     """Icon representation for an action"""
     ref: str = ""
     icon: str = ""
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Requirements:
     """Plugin requirements configuration"""
     reply_to: str
@@ -30,7 +34,7 @@ class Requirements:
     handler: Optional[Callable[[Msg], Union[Any, Awaitable[Any]]]] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PluginIntro:
     """Plugin introduction response"""
     name: str
@@ -39,14 +43,14 @@ class PluginIntro:
     requirements: Optional[Requirements] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ActionFormBuilder:
     """Action form configuration"""
     jsonui: Dict[str, Any]
     jsonschema: Dict[str, Any]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Action:
     """Plugin action definition"""
     method: str
@@ -57,7 +61,7 @@ class Action:
     request_handler: Optional[Callable[[Msg], Union[Any, Awaitable[Any]]]] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Settings:
     """Settings form configuration"""
     jsonui: Dict[str, Any]
@@ -67,14 +71,14 @@ class Settings:
     handler: Optional[Callable[[Msg], Union[Any, Awaitable[Any]]]] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class Frame:
     """Frame for job progress"""
     title: str
     content: str
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class JobProgress:
     """Job progress update"""
     progress: int
@@ -82,7 +86,7 @@ class JobProgress:
     details: Optional[Dict[str, Any]] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class JobBodyContent:
     """Job body content"""
     job_id: str
@@ -91,14 +95,14 @@ class JobBodyContent:
     commit_on: Optional[str] = None
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class ActionRequestContent:
     """Action request content"""
     _registry: Dict[str, Any]
     body: Dict[str, Any]
 
 
-@dataclass
+@dataclass(**_SLOTS)
 class PluginEvent:
     """Plugin event for logging"""
     event: EventType
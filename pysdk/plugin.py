@@ -2,11 +2,14 @@
 Plugin management for Soren SDK
 """
 
-import json
+import functools
+import inspect
 import logging
-from typing import List, Optional, Callable, Any, Dict
+import random
+from typing import List, Optional, Callable, Any, Awaitable, Dict
 import asyncio
 
+import orjson
 from nats.errors import NoRespondersError
 
 from .sorenv import SorenSDK
@@ -14,16 +17,83 @@ from .models import PluginIntro, Settings, Action, Command, JobProgress, Frame
 
 logger = logging.getLogger("SOREN-SDK")
 
+# Set once the first Plugin has applied the default logging configuration
+_logging_configured = False
+
+_NOT_IMPLEMENTED = b'{"status":"not implemented"}'
+
+# User-supplied dicts may have non-str keys (e.g. 1), which the stdlib json
+# module stringified; orjson only does so with this option
+_JSON_OPTS = orjson.OPT_NON_STR_KEYS
+
+# Total seconds progress() keeps retrying while the agent has no responder
+# subscribed yet; matches the two 1s sleeps of the previous fixed retry
+_PROGRESS_RETRY_WINDOW = 2.0
+
+
+def _dispatcher(handler: Optional[Callable[[Any], Any]]) -> Callable[[Any], Awaitable[None]]:
+    """Wrap a message handler into a callback that responds with its result
+    
+    Coroutine functions are detected once here so their results are awaited
+    without inspection; other callables (sync wrappers, objects with an async
+    __call__) may still return an awaitable, which is awaited. Without a
+    handler the callback responds with a "not implemented" status.
+    """
+    if handler is None:
+        async def dispatch(msg):
+            await msg.respond(_NOT_IMPLEMENTED)
+    elif inspect.iscoroutinefunction(handler):
+        async def dispatch(msg):
+            result = await handler(msg)
+            if result:
+                await msg.respond(orjson.dumps(result, option=_JSON_OPTS) if isinstance(result, dict) else str(result).encode())
+    else:
+        async def dispatch(msg):
+            result = handler(msg)
+            if inspect.isawaitable(result):
+                result = await result
+            if result:
+                await msg.respond(orjson.dumps(result, option=_JSON_OPTS) if isinstance(result, dict) else str(result).encode())
+    return dispatch
+
+
+@functools.lru_cache(maxsize=256)
+def _frame_bytes(title: str, content: str) -> bytes:
+    """Serialize a progress frame, reusing the result for repeated frames"""
+    return orjson.dumps({"title": title, "content": content})
+
+
+def _progress_bytes(data: JobProgress) -> bytes:
+    """Serialize a job progress update"""
+    details_bytes = b',"details":' + orjson.dumps(data.details, option=_JSON_OPTS) if data.details else b""
+    return b'{"progress":%s,"frame":%s%s}' % (
+        orjson.dumps(data.progress),
+        _frame_bytes(data.frame.title, data.frame.content),
+        details_bytes,
+    )
+
 
 class Plugin:
     """Plugin represents a Soren plugin instance"""
     
     def __init__(self, sdk: SorenSDK):
-        logging.basicConfig(level=logging.INFO)
+        global _logging_configured
+        if not _logging_configured:
+            # Configure logging once, when the first Plugin is built, not per instance
+            logging.basicConfig(level=logging.INFO)
+            _logging_configured = True
         self.sdk = sdk
         self.intro: Optional[PluginIntro] = None
         self.settings: Optional[Settings] = None
         self.actions: List[Action] = []
+        self._intro_bytes: bytes = b"null"
+        self._settings_bytes: bytes = b"null"
+        self._actions_list_bytes: bytes = b"[]"
+        self._form_bytes: Dict[str, bytes] = {}
+        self._subscriptions: List[Any] = []
+        self._request_handlers: Dict[str, Callable[[Any], Awaitable[None]]] = {}
+        self._requirements_dispatch = _dispatcher(None)
+        self._submit_dispatch = _dispatcher(None)
     
     def set_intro(
         self,
@@ -34,16 +104,48 @@ class Plugin:
         self.intro = intro
         if self.intro.requirements and handler:
             self.intro.requirements.handler = handler
+        if intro.requirements:
+            self._requirements_dispatch = _dispatcher(intro.requirements.handler)
+        
+        intro_dict = {
+            "name": intro.name,
+            "author": intro.author,
+            "version": intro.version,
+        }
+        if intro.requirements:
+            intro_dict["requirements"] = {
+                "replyTo": intro.requirements.reply_to,
+                "jsonui": intro.requirements.jsonui,
+                "jsonschema": intro.requirements.jsonschema,
+            }
+        self._intro_bytes = orjson.dumps(intro_dict, option=_JSON_OPTS)
     
     def set_settings(
         self,
         settings: Settings,
         handler: Optional[Callable[[Any], Any]] = None
     ):
-        """Set the plugin settings"""
+        """Set the plugin settings
+        
+        The settings form is serialized here, so later changes to the Settings
+        object (e.g. its data) are only served after calling set_settings again.
+        """
         self.settings = settings
         if handler:
             self.settings.handler = handler
+        self._submit_dispatch = _dispatcher(settings.handler)
+        
+        # Use default reply_to if empty or not set
+        reply_to = settings.reply_to if settings.reply_to else "_settings.config.submit"
+        
+        settings_dict = {
+            "replyTo": reply_to,
+            "jsonui": settings.jsonui,
+            "jsonschema": settings.jsonschema,
+        }
+        if settings.data:
+            settings_dict["data"] = settings.data
+        self._settings_bytes = orjson.dumps(settings_dict, option=_JSON_OPTS)
     
     def set_actions(self, actions: List[Action]):
         """Set the plugin actions"""
@@ -58,7 +160,7 @@ class Plugin:
         await self.intro_handler()
         await self.settings_handler()
         await self.actions_handler()
-        logger.info(f"Plugin started: {self.intro.name if self.intro else 'Unknown'}")
+        logger.info("Plugin started: %s", self.intro.name if self.intro else "Unknown")
     
     async def intro_handler(self):
         """Handle intro requests"""
@@ -66,173 +168,147 @@ class Plugin:
             return
         
         subject = self.sdk.make_intro_subject()
-        
-        async def intro_callback(msg):
-            intro_dict = {
-                "name": self.intro.name,
-                "author": self.intro.author,
-                "version": self.intro.version,
-            }
-            if self.intro.requirements:
-                intro_dict["requirements"] = {
-                    "replyTo": self.intro.requirements.reply_to,
-                    "jsonui": self.intro.requirements.jsonui,
-                    "jsonschema": self.intro.requirements.jsonschema,
-                }
-            
-            intro_bytes = json.dumps(intro_dict).encode()
-            await msg.respond(intro_bytes)
-        
-        async def msg_handler(msg):
-            await intro_callback(msg)
-        
-        sub = await self.sdk.conn.subscribe(subject, cb=msg_handler)
-        logger.info(f"Subscribed to intro: {subject}")
+        await self._subscribe(subject, cb=self._on_intro)
+        logger.info("Subscribed to intro: %s", subject)
         
         # Handle requirements if present
         if self.intro.requirements and self.intro.requirements.reply_to:
             req_subject = self.sdk.make_subject(self.intro.requirements.reply_to)
-            
-            async def req_callback(msg):
-                if self.intro.requirements.handler:
-                    result = self.intro.requirements.handler(msg)
-                    if result:
-                        if asyncio.iscoroutine(result):
-                            result = await result
-                        result_bytes = json.dumps(result).encode() if isinstance(result, dict) else str(result).encode()
-                        await msg.respond(result_bytes)
-                else:
-                    await msg.respond(b'{"status":"not implemented"}')
-            
-            async def req_msg_handler(msg):
-                await req_callback(msg)
-            
-            await self.sdk.conn.subscribe(req_subject, cb=req_msg_handler)
-            logger.info(f"Subscribed to requirements: {req_subject}")
+            await self._subscribe(req_subject, cb=self._on_requirements)
+            logger.info("Subscribed to requirements: %s", req_subject)
     
     async def settings_handler(self):
         """Handle settings requests"""
         # Show settings form handler
         subject = self.sdk.make_settings_subject()
-        
-        async def settings_callback(msg):
-            logger.info("Settings Called")
-            if not self.settings:
-                await msg.respond(b"null")
-                return
-            
-            # Use default reply_to if empty or not set
-            reply_to = self.settings.reply_to if self.settings.reply_to else "_settings.config.submit"
-            
-            settings_dict = {
-                "replyTo": reply_to,
-                "jsonui": self.settings.jsonui,
-                "jsonschema": self.settings.jsonschema,
-            }
-            if self.settings.data:
-                settings_dict["data"] = self.settings.data
-            
-            settings_bytes = json.dumps(settings_dict).encode()
-            await msg.respond(settings_bytes)
-        
-        async def settings_msg_handler(msg):
-            await settings_callback(msg)
-        
-        await self.sdk.conn.subscribe(subject, cb=settings_msg_handler)
-        logger.info(f"Subscribed to settings: {subject}")
+        await self._subscribe(subject, cb=self._on_settings)
+        logger.info("Subscribed to settings: %s", subject)
         
         # Settings submit handler
         if self.settings:
             # Use default reply_to if empty or not set
             reply_to = self.settings.reply_to if self.settings.reply_to else "_settings.config.submit"
             submit_subject = self.sdk.make_subject(reply_to)
-            
-            async def submit_callback(msg):
-                if self.settings.handler:
-                    result = self.settings.handler(msg)
-                    if result:
-                        if asyncio.iscoroutine(result):
-                            result = await result
-                        result_bytes = json.dumps(result).encode() if isinstance(result, dict) else str(result).encode()
-                        await msg.respond(result_bytes)
-                else:
-                    await msg.respond(b'{"status":"not implemented"}')
-            
-            async def submit_msg_handler(msg):
-                await submit_callback(msg)
-            
-            await self.sdk.conn.subscribe(submit_subject, cb=submit_msg_handler)
-            logger.info(f"Subscribed to settings submit: {submit_subject}")
+            await self._subscribe(submit_subject, cb=self._on_settings_submit)
+            logger.info("Subscribed to settings submit: %s", submit_subject)
     
     async def actions_handler(self):
         """Handle actions requests"""
         # Actions list handler
         list_subject = self.sdk.make_actions_list_subject()
+        actions_list = []
+        for action in self.actions:
+            action_dict = {
+                "method": action.method,
+                "title": action.title,
+                "description": action.description,
+                "icon": {
+                    "ref": action.icon.ref,
+                    "icon": action.icon.icon,
+                },
+            }
+            actions_list.append(action_dict)
+        self._actions_list_bytes = orjson.dumps(actions_list)
         
-        async def list_callback(msg):
-            actions_list = []
-            for action in self.actions:
-                action_dict = {
-                    "method": action.method,
-                    "title": action.title,
-                    "description": action.description,
-                    "icon": {
-                        "ref": action.icon.ref,
-                        "icon": action.icon.icon,
+        await self._subscribe(list_subject, cb=self._on_actions_list)
+        logger.info("Subscribed to actions list: %s", list_subject)
+        
+        # Dispatch tables keyed by the subject each action is served on
+        self._form_bytes.clear()
+        self._request_handlers.clear()
+        form_wildcards = set()
+        for action in self.actions:
+            form_subject = self.sdk.make_form_subject(action.method)
+            if action.form:
+                self._form_bytes[form_subject] = orjson.dumps(
+                    {
+                        "jsonui": action.form.jsonui,
+                        "jsonschema": action.form.jsonschema,
                     },
-                }
-                actions_list.append(action_dict)
+                    option=_JSON_OPTS,
+                )
+            else:
+                self._form_bytes[form_subject] = b"{}"
+            # Methods may contain dots, so one wildcard is needed per token count
+            form_wildcards.add(self.sdk.make_form_subject(".".join("*" * (action.method.count(".") + 1))))
+            logger.info("Form Builder Service: %s", form_subject)
             
-            list_bytes = json.dumps(actions_list).encode()
-            await msg.respond(list_bytes)
-        
-        async def list_msg_handler(msg):
-            await list_callback(msg)
+            cpu_subject = self.sdk.make_action_cpu(action.method)
+            if action.request_handler:
+                self._request_handlers[cpu_subject] = _dispatcher(action.request_handler)
         
-        await self.sdk.conn.subscribe(list_subject, cb=list_msg_handler)
-        logger.info(f"Subscribed to actions list: {list_subject}")
+        for form_subject in form_wildcards:
+            await self._subscribe(form_subject, cb=self._on_action_form)
         
-        # Individual action handlers
+        # Action subjects share the job update namespace, so they are subscribed exactly
         for action in self.actions:
-            # Form handler
-            form_subject = self.sdk.make_form_subject(action.method)
-            
-            async def form_callback(msg, act=action):
-                if not act.form:
-                    await msg.respond(b"{}")
-                    return
-                
-                form_dict = {
-                    "jsonui": act.form.jsonui,
-                    "jsonschema": act.form.jsonschema,
-                }
-                form_bytes = json.dumps(form_dict).encode()
-                await msg.respond(form_bytes)
-            
-            async def form_msg_handler(msg, act=action):
-                await form_callback(msg, act)
-            
-            await self.sdk.conn.subscribe(form_subject, cb=form_msg_handler)
-            logger.info(f"Form Builder Service: {form_subject}")
-            
-            # Request handler
             cpu_subject = self.sdk.make_action_cpu(action.method)
+            await self._subscribe(cpu_subject, cb=self._on_action_cpu)
+            logger.info("Subscribed Action: %s", cpu_subject)
+    
+    async def _on_intro(self, msg):
+        """Respond with the plugin introduction"""
+        await msg.respond(self._intro_bytes)
+    
+    async def _on_requirements(self, msg):
+        """Dispatch a requirements submission to its handler"""
+        await self._requirements_dispatch(msg)
+    
+    async def _on_settings(self, msg):
+        """Respond with the settings form"""
+        logger.info("Settings Called")
+        await msg.respond(self._settings_bytes)
+    
+    async def _on_settings_submit(self, msg):
+        """Dispatch a settings submission to its handler"""
+        await self._submit_dispatch(msg)
+    
+    async def _on_actions_list(self, msg):
+        """Respond with the list of actions"""
+        await msg.respond(self._actions_list_bytes)
+    
+    async def _on_action_form(self, msg):
+        """Respond with the precomputed form of the requested action
+        
+        The wildcard subscription also matches methods this plugin doesn't
+        have; they get an empty form, like actions without one, so the agent
+        isn't left waiting for its request to time out.
+        """
+        await msg.respond(self._form_bytes.get(msg.subject, b"{}"))
+    
+    async def _on_action_cpu(self, msg):
+        """Dispatch an action request to its handler"""
+        dispatch = self._request_handlers.get(msg.subject)
+        if dispatch is not None:
+            await dispatch(msg)
             
-            async def request_callback(msg, act=action):
-                if act.request_handler:
-                    result = act.request_handler(msg)
-                    if result:
-                        if asyncio.iscoroutine(result):
-                            result = await result
-                        result_bytes = json.dumps(result).encode() if isinstance(result, dict) else str(result).encode()
-                        await msg.respond(result_bytes)
-            
-            async def request_msg_handler(msg, act=action):
-                await request_callback(msg, act)
-            
-            await self.sdk.conn.subscribe(cpu_subject, cb=request_msg_handler)
-            logger.info(f"Subscribed Action: {cpu_subject}")
-            
+    async def _subscribe(self, subject: str, cb: Callable[[Any], Awaitable[None]]):
+        """Subscribe on the SDK connection and remember the subscription for stop()"""
+        self._subscriptions.append(await self.sdk.conn.subscribe(subject, cb=cb))
+    
+    async def stop(self):
+        """Drain the NATS connection: finish in-flight messages, then close it
+        
+        A pooled connection is shared with other SDKs, so instead of draining it
+        this plugin's subscriptions are removed, pending messages are flushed and
+        the SDK releases its reference through sdk.close().
+        """
+        conn = self.sdk.conn
+        if conn is None or conn.is_closed:
+            return
+        if not self.sdk.pooled:
+            await conn.drain()
+            return
+        for sub in self._subscriptions:
+            await sub.unsubscribe()
+        self._subscriptions.clear()
+        await conn.flush()
+        await self.sdk.close()
+    
+    async def flush(self):
+        """Flush any buffered messages on the NATS connection"""
+        await self.sdk.conn.flush()
+    
     async def done(self, job_id :str ,data :Dict[str, Any]) -> Any:
         return await self.progress(job_id,Command.PROGRESS,JobProgress(progress=100,frame=Frame(title="Completed", content="Job completed successfully"),details=data))
         
@@ -242,40 +318,66 @@ class Plugin:
         command: Command,
         data: JobProgress
     ) -> Any:
-        """Send progress update for a job"""
-        sub = self.sdk.make_job_subject(job_id, command.value)
+        """Send progress update for a job and wait for the agent to reply
         
-        data_dict = {
-            "progress": data.progress,
-            "frame": {
-                "title": data.frame.title,
-                "content": data.frame.content,
-            },
-        }
-        if data.details:
-            data_dict["details"] = data.details
-        
-        data_bytes = json.dumps(data_dict).encode()
-        max_retries = 3
-        for attempt in range(max_retries):
+        Retries while no responder is subscribed yet. Use progress_async()
+        for intermediate updates that don't need a reply.
+        """
+        sub = self.sdk.cpu_prefix + job_id + "." + command.value
+        data_bytes = _progress_bytes(data)
+        # Backoff sleeps add up to _PROGRESS_RETRY_WINDOW, the last one is
+        # shortened to fit, then one final attempt is made
+        waited = 0.0
+        attempt = 0
+        while True:
             try:
                 msg = await self.sdk.conn.request(sub, data_bytes, timeout=3)
-                await self.sdk.conn.flush()
-                logger.info(f"Progress sent: {msg.data.decode() if msg.data else 'No response'}")
+                if logger.isEnabledFor(logging.INFO):
+                    logger.info("Progress sent: %s", msg.data.decode() if msg.data else "No response")
                 return msg
             except NoRespondersError as e:
-                if attempt < max_retries - 1:
+                if waited < _PROGRESS_RETRY_WINDOW:
                     # Only log on retries, not on the first attempt failure
                     # attempt 0 = first try (silent, no log)
                     # attempt 1 = first retry (log)
-                    # attempt 2 = second retry (log)
+                    # attempt 2+ = further retries (log)
+                    # Exponential backoff with jitter so concurrent jobs don't retry in lockstep
+                    delay = min(0.05 * (2 ** attempt), 1.0) * random.uniform(0.8, 1.2)
+                    remaining = _PROGRESS_RETRY_WINDOW - waited
+                    if delay >= remaining:
+                        delay = remaining
                     if attempt != 0:  # Skip logging on first attempt (attempt 0)
-                        logger.warning(f"Progress command {command} no responder error (retry {attempt}/{max_retries - 1}): {e}. Retrying in 1 second...")
-                    await asyncio.sleep(1)
+                        logger.warning(
+                            "Progress command %s no responder error (retry %d): %s. Retrying in %.2f seconds...",
+                            command.value, attempt, e, delay,
+                        )
+                    await asyncio.sleep(delay)
+                    # Land exactly on the window so float error can't add a retry
+                    waited = _PROGRESS_RETRY_WINDOW if delay == remaining else waited + delay
+                    attempt += 1
                     continue
                 else:
-                    logger.error(f"Progress command {command} no responder error after {max_retries} attempts: {e}")
+                    logger.error("Progress command %s no responder error after %d attempts: %s", command.value, attempt + 1, e)
                     return e
             except Exception as e:
-                logger.error(f"Progress command {command} error: {e}")
+                logger.error("Progress command %s error: %s", command.value, e)
                 return e
+    
+    async def progress_async(
+        self,
+        job_id: str,
+        command: Command,
+        data: JobProgress
+    ) -> Any:
+        """Publish a progress update for a job without waiting for a reply
+        
+        Nothing confirms delivery and there is no retry when the agent isn't
+        listening yet, so use progress() for updates that must arrive, such as
+        the final one sent by done().
+        """
+        sub = self.sdk.cpu_prefix + job_id + "." + command.value
+        try:
+            await self.sdk.conn.publish(sub, _progress_bytes(data))
+        except Exception as e:
+            logger.error("Progress command %s error: %s", command.value, e)
+            return e
@@ -2,16 +2,123 @@
 Core SDK for Soren v2 protocol
 """
 
+import asyncio
+import functools
+import logging
 import os
-from typing import Optional
+import sys
+import weakref
+from typing import Dict, Iterable, List, Optional, Tuple
 from contextlib import contextmanager
 import nats
 from nats.aio.client import Client as NATS
 
+logger = logging.getLogger("SOREN-SDK")
+
+# URI schemes understood by nats.connect; anything else is treated as a bare host:port
+_NATS_URI_SCHEMES = ("nats://", "tls://", "ws://", "wss://")
+
+
+@functools.lru_cache(maxsize=1)
+def _env_defaults():
+    """Read the SDK environment variables once
+    
+    Resolved on first use rather than at import so that .env files loaded
+    before creating the first Config are picked up. Call
+    _env_defaults.cache_clear() after changing the environment.
+    """
+    return (
+        os.getenv("AGENT_URI"),
+        os.getenv("PLUGIN_ID"),
+        os.getenv("SOREN_AUTH_KEY"),
+        os.getenv("SOREN_EVENT_CHANNEL"),
+        os.getenv("SOREN_STORE"),
+    )
+
+
+# Connections shared by SDKs created with pool=True. Connections and locks are
+# bound to the event loop that created them, so each running loop gets its own
+# pool, dropped with the loop; a later asyncio.run() starts from an empty one.
+# Each pool maps (agent URI, auth key) to [connection or None, number of SDKs
+# using it, lock serializing connects for that key].
+_loop_pools: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+
+def _pool_entry(key: Tuple[str, Optional[str]]) -> List:
+    """Get the running loop's pool entry for key, creating it if needed"""
+    loop = asyncio.get_running_loop()
+    pool = _loop_pools.get(loop)
+    if pool is None:
+        pool = _loop_pools[loop] = {}
+    entry = pool.get(key)
+    if entry is None:
+        # Created inside the running loop so the lock binds to it on 3.8/3.9 too
+        entry = pool[key] = [None, 0, asyncio.Lock()]
+    return entry
+
+
+async def _open_connection(uri: str) -> NATS:
+    """Open a new NATS connection"""
+    logger.info("Connecting to NATS at %s...", uri)
+    try:
+        # Add connection timeout; asyncio.timeout avoids wait_for's extra task on 3.11+
+        if sys.version_info >= (3, 11):
+            async with asyncio.timeout(10):
+                conn = await nats.connect(uri, connect_timeout=5)
+        else:
+            conn = await asyncio.wait_for(
+                nats.connect(uri, connect_timeout=5),
+                timeout=10
+            )
+        if conn.is_connected:
+            logger.info("Successfully connected to NATS at %s", uri)
+        else:
+            logger.warning("NATS connection established but not connected")
+        return conn
+    except asyncio.TimeoutError:
+        error_msg = f"Connection timeout: Failed to connect to NATS at {uri} within 10 seconds"
+        logger.error(error_msg)
+        raise ConnectionError(error_msg)
+    except Exception as e:
+        error_msg = f"Failed to connect to NATS at {uri}: {e}"
+        logger.error(error_msg)
+        raise ConnectionError(error_msg) from e
+
+
+async def _acquire_pooled(key: Tuple[str, Optional[str]]) -> NATS:
+    """Get the pooled connection for key, opening it if needed
+    
+    Only connects for the same key wait on each other; a slow agent URI
+    doesn't hold up SDKs pooled on other ones.
+    """
+    entry = _pool_entry(key)
+    async with entry[2]:
+        if entry[0] is None or entry[0].is_closed:
+            entry[0] = await _open_connection(key[0])
+            entry[1] = 0
+        entry[1] += 1
+        return entry[0]
+
+
+def _release_pooled(key: Tuple[str, Optional[str]], conn: NATS) -> bool:
+    """Drop one user of a pooled connection, returning True if it should be closed"""
+    pool = _loop_pools.get(asyncio.get_running_loop())
+    entry = pool.get(key) if pool is not None else None
+    if entry is None or entry[0] is not conn:
+        return True
+    entry[1] -= 1
+    if entry[1] > 0:
+        return False
+    # Keep the entry and its lock so a concurrent acquire opens a fresh connection
+    entry[0] = None
+    return True
+
 
 class Config:
     """Configuration for the Soren SDK"""
     
+    __slots__ = ("agent_uri", "plugin_id", "auth_key", "event_channel", "store_channel")
+    
     def __init__(
         self,
         agent_uri: Optional[str] = None,
@@ -20,17 +127,48 @@ class Config:
         event_channel: Optional[str] = None,
         store_channel: Optional[str] = None,
     ):
-        self.agent_uri = agent_uri or os.getenv("AGENT_URI")
-        self.plugin_id = plugin_id or os.getenv("PLUGIN_ID")
-        self.auth_key = auth_key or os.getenv("SOREN_AUTH_KEY")
-        self.event_channel = event_channel or os.getenv("SOREN_EVENT_CHANNEL")
-        self.store_channel = store_channel or os.getenv("SOREN_STORE")
+        env_agent_uri, env_plugin_id, env_auth_key, env_event_channel, env_store = _env_defaults()
+        self.agent_uri = agent_uri or env_agent_uri
+        # Ensure URI has nats:// protocol prefix
+        if self.agent_uri and not self.agent_uri.startswith(_NATS_URI_SCHEMES):
+            self.agent_uri = f"nats://{self.agent_uri}"
+        self.plugin_id = plugin_id or env_plugin_id
+        self.auth_key = auth_key or env_auth_key
+        self.event_channel = event_channel or env_event_channel
+        self.store_channel = store_channel or env_store
 
 
 class SorenSDK:
-    """SorenSDK represents the main SDK instance for Soren v2 protocol"""
+    """SorenSDK represents the main SDK instance for Soren v2 protocol
+    
+    v2_prefix ("soren.v2.<plugin_id>.") and cpu_prefix ("soren.cpu.<plugin_id>.")
+    are public, so code that builds subjects in a tight loop can concatenate
+    onto them directly instead of calling a make_* method per message. Likewise
+    conn and config.plugin_id are stable public attributes; prefer them to the
+    get_connection()/get_plugin_id() accessors on hot paths.
+    """
     
-    def __init__(self, config: Config):
+    __slots__ = (
+        "config",
+        "conn",
+        "_closed",
+        "_pool_key",
+        "v2_prefix",
+        "cpu_prefix",
+        "_settings_subject",
+        "_actions_subject",
+        "_intro_subject",
+        "_make_subject",
+        "_make_form_subject",
+        "_make_action_cpu",
+    )
+    
+    def __init__(self, config: Config, pool: bool = False):
+        """Create an SDK instance
+        
+        With pool=True, connect() reuses a process-wide connection shared by
+        every pooled SDK with the same agent URI and auth key.
+        """
         if not config.agent_uri:
             raise ValueError("agent URI is required")
         if not config.plugin_id:
@@ -39,87 +177,121 @@ class SorenSDK:
         self.config = config
         self.conn: Optional[NATS] = None
         self._closed = False
+        self._pool_key = (config.agent_uri, config.auth_key) if pool else None
+        
+        # plugin_id is fixed for the SDK's lifetime, so subject prefixes are built once.
+        # Interning lets dict lookups keyed by these subjects match on identity.
+        self.v2_prefix = sys.intern(f"soren.v2.{config.plugin_id}.")
+        self.cpu_prefix = sys.intern(f"soren.cpu.{config.plugin_id}.")
+        self._settings_subject = sys.intern(self.v2_prefix + "@settings")
+        self._actions_subject = sys.intern(self.v2_prefix + "@actions")
+        self._intro_subject = sys.intern(self.v2_prefix + "@intro")
+        
+        # Plugins use a small fixed set of actions, so per-action subjects are memoized
+        v2_prefix = self.v2_prefix
+        cpu_prefix = self.cpu_prefix
+        self._make_subject = functools.lru_cache(maxsize=256)(
+            lambda action: sys.intern(v2_prefix + action)
+        )
+        self._make_form_subject = functools.lru_cache(maxsize=256)(
+            lambda action: sys.intern(v2_prefix + action + ".@form")
+        )
+        self._make_action_cpu = functools.lru_cache(maxsize=256)(
+            lambda action: sys.intern(cpu_prefix + action)
+        )
     
     async def connect(self):
         """Connect to NATS"""
-        if self.conn is None or self.conn.is_closed:
-            # Ensure URI has nats:// protocol prefix
-            uri = self.config.agent_uri
-            if not uri.startswith(('nats://', 'tls://', 'ws://', 'wss://')):
-                uri = f"nats://{uri}"
-            
-            print(f"Connecting to NATS at {uri}...")
-            try:
-                # Add connection timeout
-                import asyncio
-                self.conn = await asyncio.wait_for(
-                    nats.connect(uri, connect_timeout=5),
-                    timeout=10
-                )
-                if self.conn.is_connected:
-                    print(f"Successfully connected to NATS at {uri}")
-                else:
-                    print(f"Warning: NATS connection established but not connected")
-            except asyncio.TimeoutError:
-                error_msg = f"Connection timeout: Failed to connect to NATS at {uri} within 10 seconds"
-                print(error_msg)
-                raise ConnectionError(error_msg)
-            except Exception as e:
-                error_msg = f"Failed to connect to NATS at {uri}: {e}"
-                print(error_msg)
-                raise ConnectionError(error_msg) from e
-        return self.conn
+        conn = self.conn
+        if conn is None or conn.is_closed:
+            if self._pool_key is None:
+                conn = await _open_connection(self.config.agent_uri)
+            else:
+                conn = await _acquire_pooled(self._pool_key)
+            self.conn = conn
+            self._closed = False
+        return conn
     
     async def close(self):
         """Close the SDK connection and clean up resources"""
-        if self.conn and not self.conn.is_closed:
-            await self.conn.close()
+        if self._closed:
+            return
+        conn = self.conn
+        if conn is not None and not conn.is_closed:
+            # A pooled connection is only closed once its last SDK lets go of it
+            if self._pool_key is None or _release_pooled(self._pool_key, conn):
+                await conn.close()
+        if self._pool_key is not None:
+            # Drop the shared connection so a later connect() reacquires it from the pool
+            self.conn = None
         self._closed = True
     
+    @property
+    def pooled(self) -> bool:
+        """Whether this SDK shares a process-wide pooled connection"""
+        return self._pool_key is not None
+    
+    async def publish_batch(
+        self,
+        subject: str,
+        payloads: Iterable[bytes],
+        headers: Optional[Dict[str, str]] = None,
+        timeout: float = 3,
+    ):
+        """Publish several payloads to a subject and confirm them with a single flush
+        
+        The flush round trip is paid once for the whole batch instead of once
+        per message.
+        """
+        conn = self.conn
+        for payload in payloads:
+            await conn.publish(subject, payload, headers=headers)
+        await conn.flush(timeout=timeout)
+    
     def get_connection(self) -> Optional[NATS]:
-        """Get the underlying NATS connection"""
+        """Get the underlying NATS connection (same as reading sdk.conn directly)"""
         return self.conn
     
     def get_plugin_id(self) -> str:
-        """Get the plugin ID"""
+        """Get the plugin ID (same as reading sdk.config.plugin_id directly)"""
         return self.config.plugin_id
     
     def make_subject(self, action: str) -> str:
         """Create a subject with the soren.v2 prefix"""
-        return f"soren.v2.{self.config.plugin_id}.{action}"
+        return self._make_subject(action)
     
     def make_settings_subject(self) -> str:
         """Create a subject for settings"""
-        return f"soren.v2.{self.config.plugin_id}.@settings"
+        return self._settings_subject
     
     def make_actions_list_subject(self) -> str:
         """Create a subject for actions list"""
-        return f"soren.v2.{self.config.plugin_id}.@actions"
+        return self._actions_subject
     
     def make_intro_subject(self) -> str:
         """Create a subject for intro"""
-        return f"soren.v2.{self.config.plugin_id}.@intro"
+        return self._intro_subject
     
     def make_action_cpu(self, action: str) -> str:
         """Create a subject for action execution"""
-        return f"soren.cpu.{self.config.plugin_id}.{action}"
+        return self._make_action_cpu(action)
     
     def make_job_subject(self, job_id: str, job_update: str) -> str:
         """Create a subject for job updates"""
-        return f"soren.cpu.{self.config.plugin_id}.{job_id}.{job_update}"
+        return self.cpu_prefix + job_id + "." + job_update
     
     def make_form_subject(self, action: str) -> str:
         """Create a subject for form requests"""
-        return f"soren.v2.{self.config.plugin_id}.{action}.@form"
+        return self._make_form_subject(action)
     
     def make_progress_subject(self, job_id: str) -> str:
         """Create a subject for progress updates"""
-        return f"soren.cpu.{self.config.plugin_id}.{job_id}.*"
+        return self.cpu_prefix + job_id + ".*"
 
 
-def NewFromEnv() -> SorenSDK:
+def NewFromEnv(pool: bool = False) -> SorenSDK:
     """Create a new Soren SDK instance using environment variables"""
     config = Config()
-    return SorenSDK(config)
+    return SorenSDK(config, pool=pool)
 
 
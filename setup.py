@@ -2,14 +2,13 @@
 Setup file for Soren Python SDK
 """
 
+import os
+
 from setuptools import setup, find_packages
 
-try:
-    with open("README.md", "r", encoding="utf-8") as fh:
-        long_description = fh.read()
-except FileNotFoundError:
-    with open("README_PYTHON.md", "r", encoding="utf-8") as fh:
-        long_description = fh.read()
+readme = "README.md" if os.path.exists("README.md") else "README_PYTHON.md"
+with open(readme, "r", encoding="utf-8") as fh:
+    long_description = fh.read()
 
 setup(
     name="soren-python-sdk",
@@ -35,8 +34,12 @@ setup(
     install_requires=[
         "nats-py>=2.0.0",
         "python-dotenv>=1.0.0",
+        "orjson>=3.10.0",
     ],
     extras_require={
+        "speedups": [
+            "uvloop>=0.17.0; platform_system != 'Windows'",
+        ],
         "dev": [
             "pytest>=7.0.0",
             "black>=23.0.0",